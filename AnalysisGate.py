@@ -0,0 +1,481 @@
+import ast
+import json
+import os
+import subprocess
+import time
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from CyclomaticComplexityAnalyzer import ComplexityVisitor, CyclomaticComplexityAnalyzer
+from CodeSafetyAnalyzer import PATTERN_LOCATIONS, CodeSafetyAnalyzer, CodeVisitor
+from SecretsDetector import SecretsDetector
+
+RISK_ORDER = {'low': 0, 'medium': 1, 'high': 2}
+
+CHECK_INTERVAL = 256  # nodes visited between cancellation checks
+
+class GateTriggered(Exception):
+    """Raised inside a traversal once a failing condition is met"""
+
+    def __init__(self, failure: Dict):
+        super().__init__(failure)
+        self.failure = failure
+
+class GateCancelled(Exception):
+    """Raised inside a traversal when the run is cancelled or out of budget"""
+
+class _CooperativeVisitorMixin:
+    """Periodically polls a stop callback while visiting nodes"""
+
+    def _init_cooperative(self, should_stop: Optional[Callable[[], bool]]):
+        """Set up the stop callback and node counter"""
+        self.should_stop = should_stop
+        self.visited_nodes = 0
+
+    def visit(self, node):
+        """Visit a node, checking for cancellation every CHECK_INTERVAL nodes"""
+        self.visited_nodes += 1
+        if (self.should_stop is not None and self.visited_nodes % CHECK_INTERVAL == 0
+                and self.should_stop()):
+            raise GateCancelled()
+        return super().visit(node)
+
+class GateComplexityVisitor(_CooperativeVisitorMixin, ComplexityVisitor):
+    """Complexity visitor that stops as soon as a function reaches the threshold"""
+
+    def __init__(self, threshold: int, should_stop: Optional[Callable[[], bool]] = None):
+        super().__init__()
+        self._init_cooperative(should_stop)
+        self.threshold = threshold
+        self.function_frames = []  # (qualified name, line, total complexity at entry)
+
+    def visit_FunctionDef(self, node):
+        """Visit function definition, tracking where its running count starts"""
+        self.function_frames.append(
+            ('.'.join(self.scope + [node.name]), node.lineno, self.total_complexity))
+        try:
+            super().visit_FunctionDef(node)
+        finally:
+            self.function_frames.pop()
+
+    def _add_decision_point(self, node, decision_type):
+        """Record a decision point and fail once the running count reaches the threshold"""
+        super()._add_decision_point(node, decision_type)
+        if not self.function_frames:
+            return
+        # The outermost function includes nested ones, so it reaches the threshold first
+        name, line, start = self.function_frames[0]
+        complexity = self.total_complexity - start + 1
+        if complexity >= self.threshold:
+            raise GateTriggered({
+                'kind': 'complexity',
+                'name': name,
+                'line': line,
+                'complexity': complexity
+            })
+
+class GateCodeVisitor(_CooperativeVisitorMixin, CodeVisitor):
+    """Safety visitor that stops at the first location of a watched pattern"""
+
+    def __init__(self, watched: Dict[str, str],
+                 should_stop: Optional[Callable[[], bool]] = None):
+        super().__init__()
+        self._init_cooperative(should_stop)
+        self.watched = watched  # pattern key -> risk level
+
+    def _check_watched(self):
+        """Fail on the first recorded location of any watched pattern"""
+        for key, risk_level in self.watched.items():
+            attr = PATTERN_LOCATIONS.get(key)
+            locations = getattr(self, attr) if attr else None
+            if locations:
+                raise GateTriggered({
+                    'kind': 'finding',
+                    'pattern': key,
+                    'risk_level': risk_level,
+                    'line': locations[0]
+                })
+
+    def visit_Assign(self, node):
+        super().visit_Assign(node)
+        self._check_watched()
+
+    def visit_Call(self, node):
+        super().visit_Call(node)
+        self._check_watched()
+
+    def visit_BinOp(self, node):
+        super().visit_BinOp(node)
+        self._check_watched()
+
+    def visit_ExceptHandler(self, node):
+        super().visit_ExceptHandler(node)
+        self._check_watched()
+
+def gate_source(code: str, threshold: Optional[int], watched: Dict[str, str],
+                should_stop: Optional[Callable[[], bool]] = None,
+                secrets_detector: Optional[SecretsDetector] = None) -> Dict:
+    """
+    Check one source string against the gate conditions
+
+    Args:
+        code: Source code to check
+        threshold: Complexity that fails the gate, or None to skip complexity
+        watched: Pattern keys (with risk levels) that fail the gate
+        should_stop: Callback polled during traversal for cancellation
+        secrets_detector: Detector for patterns scored after traversal
+
+    Returns:
+        Dictionary with 'status' ('pass', 'fail', 'cancelled' or 'error'),
+        'failures' and 'max_complexity'
+    """
+    result = {'status': 'pass', 'failures': [], 'max_complexity': 0}
+    try:
+        tree = ast.parse(code)
+        # Parsing cannot be interrupted, so check once before traversal starts
+        if should_stop is not None and should_stop():
+            raise GateCancelled()
+
+        if threshold is not None:
+            visitor = GateComplexityVisitor(threshold, should_stop)
+            try:
+                visitor.visit(tree)
+            finally:
+                result['max_complexity'] = max(
+                    (m.complexity for m in visitor.metrics), default=0)
+
+        if watched:
+            visitor = GateCodeVisitor(watched, should_stop)
+            visitor.visit(tree)
+            # Catch locations recorded by visit methods without an early check
+            visitor._check_watched()
+            if 'high_entropy_secret' in watched:
+                detector = secrets_detector or SecretsDetector()
+                secrets = detector.scan(visitor.string_constants)
+                if secrets:
+                    raise GateTriggered({
+                        'kind': 'finding',
+                        'pattern': 'high_entropy_secret',
+                        'risk_level': watched['high_entropy_secret'],
+                        'line': secrets[0]['line']
+                    })
+    except GateTriggered as e:
+        result['status'] = 'fail'
+        result['failures'].append(e.failure)
+        if e.failure['kind'] == 'complexity':
+            result['max_complexity'] = max(result['max_complexity'], e.failure['complexity'])
+    except GateCancelled:
+        result['status'] = 'cancelled'
+    except SyntaxError:
+        result['status'] = 'error'
+        result['error'] = 'Invalid Python syntax'
+    except (RecursionError, MemoryError, ValueError):
+        result['status'] = 'error'
+        result['error'] = 'Analysis failed'
+    return result
+
+# Per-process state for pool workers
+_cancel_event = None
+
+def _init_worker(cancel_event):
+    """Pool initializer: share the cancellation event with the worker"""
+    global _cancel_event
+    _cancel_event = cancel_event
+
+def _gate_file(path: str, threshold: Optional[int], watched: Dict[str, str],
+               deadline: Optional[float],
+               secrets_detector: Optional[SecretsDetector] = None) -> Dict:
+    """Pool entry point: check one file, honouring cancellation and the deadline"""
+    def should_stop():
+        if _cancel_event is not None and _cancel_event.is_set():
+            return True
+        return deadline is not None and time.time() > deadline
+
+    if should_stop():
+        return {'path': path, 'status': 'cancelled', 'failures': [], 'max_complexity': 0}
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            code = f.read()
+    except OSError as e:
+        return {'path': path, 'status': 'error', 'error': str(e),
+                'failures': [], 'max_complexity': 0}
+    result = gate_source(code, threshold, watched, should_stop, secrets_detector)
+    result['path'] = path
+    for failure in result['failures']:
+        failure['path'] = path
+    return result
+
+class AnalysisGate:
+    def __init__(self, complexity_analyzer: Optional[CyclomaticComplexityAnalyzer] = None,
+                 safety_analyzer: Optional[CodeSafetyAnalyzer] = None,
+                 fail_on_complexity: bool = True, fail_on_risk: Optional[str] = 'high',
+                 budget: Optional[float] = None, max_workers: Optional[int] = None,
+                 history_path: Optional[str] = None, repo_path: str = '.'):
+        """
+        Initialize a fail-fast gate
+
+        Args:
+            complexity_analyzer: Supplies threshold_critical for the complexity condition
+            safety_analyzer: Supplies pattern risk levels for the finding condition
+            fail_on_complexity: Fail when any function reaches threshold_critical
+            fail_on_risk: Fail on any finding at or above this risk level (None disables)
+            budget: Wall-clock seconds allowed for the whole run (None for no limit).
+                It is checked between files and every CHECK_INTERVAL nodes of a
+                traversal, not during ast.parse, so a run can overshoot it by the
+                time taken to parse the files in flight
+            max_workers: Worker processes; 0 checks files sequentially in-process
+            history_path: JSON file recording previously failing and complex files
+            repo_path: Git repository used to find recently changed files
+        """
+        self.logger = logging.getLogger(__name__)
+        self.complexity_analyzer = complexity_analyzer or CyclomaticComplexityAnalyzer()
+        self.safety_analyzer = safety_analyzer or CodeSafetyAnalyzer()
+        self.threshold = (self.complexity_analyzer.threshold_critical
+                          if fail_on_complexity else None)
+        self.watched = {}
+        if fail_on_risk is not None:
+            self.watched = {
+                key: p.risk_level for key, p in self.safety_analyzer.patterns.items()
+                if RISK_ORDER[p.risk_level] >= RISK_ORDER[fail_on_risk]
+            }
+        for key in self.watched:
+            if key not in PATTERN_LOCATIONS:
+                self.logger.warning(
+                    f"Pattern '{key}' has no location source and cannot fail the gate")
+        self.secrets_detector = self.safety_analyzer.secrets_detector
+        self.budget = budget
+        self.max_workers = max_workers
+        self.history_path = history_path
+        self.repo_path = repo_path
+
+    def check_code(self, code: str) -> Dict:
+        """Check a single source string in-process"""
+        deadline = time.time() + self.budget if self.budget is not None else None
+        should_stop = (lambda: time.time() > deadline) if deadline is not None else None
+        result = gate_source(code, self.threshold, self.watched, should_stop,
+                             self.secrets_detector)
+        if result['status'] == 'cancelled':
+            result['status'] = 'timeout'
+        return result
+
+    def check_paths(self, paths: List[str]) -> Dict:
+        """
+        Check files until the first failure, the end of the list or the budget
+
+        Args:
+            paths: Python files to check
+
+        Returns:
+            Dictionary with overall 'status' ('pass', 'fail', 'timeout' or 'error'),
+            the first offending 'failures', files that could not be analyzed, and
+            counts of checked and skipped files
+        """
+        start = time.time()
+        deadline = start + self.budget if self.budget is not None else None
+        ordered = self._prioritize(paths)
+
+        if self.max_workers == 0:
+            results = self._run_sequential(ordered, deadline)
+        else:
+            results = self._run_pool(ordered, deadline)
+
+        failures = [f for r in results if r['status'] == 'fail' for f in r['failures']]
+        checked = [r for r in results if r['status'] in ('pass', 'fail')]
+        errors = [{'path': r['path'], 'error': r['error']}
+                  for r in results if r['status'] == 'error']
+        if failures:
+            status = 'fail'
+        elif len(checked) + len(errors) < len(ordered):
+            status = 'timeout'
+        elif errors:
+            status = 'error'
+        else:
+            status = 'pass'
+
+        self._update_history(results)
+        return {
+            'status': status,
+            'failures': failures,
+            'files_checked': len(checked),
+            'files_skipped': len(ordered) - len(checked) - len(errors),
+            'errors': errors,
+            'elapsed': time.time() - start
+        }
+
+    def _run_sequential(self, paths: List[str], deadline: Optional[float]) -> List[Dict]:
+        """Check files one by one in this process"""
+        results = []
+        for path in paths:
+            try:
+                result = _gate_file(path, self.threshold, self.watched, deadline,
+                                    self.secrets_detector)
+            except Exception as e:
+                result = self._error_result(path, e)
+            results.append(result)
+            if result['status'] in ('fail', 'cancelled'):
+                break
+        return results
+
+    def _run_pool(self, paths: List[str], deadline: Optional[float]) -> List[Dict]:
+        """Check files in worker processes, cancelling everything on the first failure"""
+        workers = self.max_workers or os.cpu_count() or 1
+        cancel_event = multiprocessing.Event()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(cancel_event,))
+        results = []
+        pending = {}  # future -> path
+        queue = iter(paths)
+        try:
+            # Keep a small window in flight so submission follows priority order
+            stop = False
+            while True:
+                while not stop and len(pending) < workers * 2:
+                    path = next(queue, None)
+                    if path is None:
+                        break
+                    future = executor.submit(_gate_file, path, self.threshold,
+                                             self.watched, deadline, self.secrets_detector)
+                    pending[future] = path
+                if not pending:
+                    break
+                timeout = max(deadline - time.time(), 0) if deadline is not None else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = self._future_result(future, pending.pop(future))
+                    results.append(result)
+                    if result['status'] == 'fail':
+                        stop = True
+                if deadline is not None and time.time() > deadline:
+                    stop = True
+                if stop:
+                    cancel_event.set()
+                    for future in pending:
+                        future.cancel()
+                    # Running tasks poll the event and return promptly
+                    for future, path in pending.items():
+                        if not future.cancelled():
+                            results.append(self._future_result(future, path))
+                    break
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return results
+
+    def _future_result(self, future, path: str) -> Dict:
+        """Get a worker's result, turning a crashed worker into an error entry"""
+        try:
+            return future.result()
+        except Exception as e:
+            return self._error_result(path, e)
+
+    def _error_result(self, path: str, error: Exception) -> Dict:
+        """Turn an unexpected exception while checking a file into an error entry"""
+        self.logger.error(f"Gate check failed on {path}: {error!r}")
+        return {'path': path, 'status': 'error', 'error': 'Analysis failed',
+                'failures': [], 'max_complexity': 0}
+
+    def _prioritize(self, paths: List[str]) -> List[str]:
+        """Order files so historically worst and recently changed ones run first"""
+        history = self._load_history()
+        recent = self._recently_changed()
+
+        def key(item):
+            index, path = item
+            entry = history.get(os.path.realpath(path), {})
+            return (-entry.get('failures', 0), -entry.get('max_complexity', 0),
+                    recent.get(os.path.realpath(path), len(recent)), index)
+
+        return [path for _, path in sorted(enumerate(paths), key=key)]
+
+    def _recently_changed(self, max_commits: int = 50) -> Dict[str, int]:
+        """Map files touched by recent commits to their recency rank"""
+        try:
+            root = subprocess.run(
+                ['git', '-C', self.repo_path, 'rev-parse', '--show-toplevel'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, text=True
+            ).stdout.strip()
+            log = subprocess.run(
+                ['git', '-C', root, '-c', 'core.quotepath=off', 'log', '--format=',
+                 '--name-only', f'-n{max_commits}', '--', '*.py'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, text=True
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            return {}
+        ranks = {}
+        for name in log.splitlines():
+            if name:
+                ranks.setdefault(os.path.realpath(os.path.join(root, name)), len(ranks))
+        return ranks
+
+    def _load_history(self) -> Dict[str, Dict]:
+        """Load per-file failure history, if configured"""
+        if not self.history_path:
+            return {}
+        try:
+            with open(self.history_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_history(self, results: List[Dict]) -> None:
+        """Record failures and peak complexity of checked files for future ordering"""
+        if not self.history_path:
+            return
+        history = self._load_history()
+        for result in results:
+            if result['status'] not in ('pass', 'fail'):
+                continue
+            entry = history.setdefault(os.path.realpath(result['path']),
+                                       {'failures': 0, 'max_complexity': 0})
+            if result['status'] == 'fail':
+                entry['failures'] += 1
+            entry['max_complexity'] = max(entry['max_complexity'], result['max_complexity'])
+        try:
+            with open(self.history_path, 'w', encoding='utf-8') as f:
+                json.dump(history, f, indent=2, sort_keys=True)
+        except OSError as e:
+            self.logger.error(f"Failed to write gate history: {e}")
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Fail fast on complexity or risky findings')
+    parser.add_argument('paths', nargs='+', help='Python files to check')
+    parser.add_argument('--budget', type=float, help='time budget in seconds')
+    parser.add_argument('--workers', type=int, help='worker processes (0 for in-process)')
+    parser.add_argument('--history', help='JSON file used to prioritize previously failing files')
+    parser.add_argument('--fail-on-risk', default='high', choices=sorted(RISK_ORDER),
+                        help='lowest finding risk level that fails the gate')
+    parser.add_argument('--no-complexity', action='store_true',
+                        help='do not fail on function complexity')
+    args = parser.parse_args()
+
+    gate = AnalysisGate(fail_on_complexity=not args.no_complexity,
+                        fail_on_risk=args.fail_on_risk, budget=args.budget,
+                        max_workers=args.workers, history_path=args.history)
+    outcome = gate.check_paths(args.paths)
+
+    print(f"\nGate: {outcome['status'].upper()} "
+          f"({outcome['files_checked']} checked, {outcome['files_skipped']} skipped, "
+          f"{len(outcome['errors'])} errors, {outcome['elapsed']:.2f}s)")
+    for failure in outcome['failures']:
+        if failure['kind'] == 'complexity':
+            print(f"- {failure['path']}:{failure['line']} {failure['name']} "
+                  f"complexity {failure['complexity']}")
+        else:
+            print(f"- {failure['path']}:{failure['line']} {failure['pattern']} "
+                  f"(Risk Level: {failure['risk_level']})")
+
+    for error in outcome['errors']:
+        print(f"- {error['path']}: {error['error']}")
+
+    # 0 pass, 1 fail, 2 out of budget, 3 files could not be analyzed
+    sys.exit({'pass': 0, 'fail': 1, 'timeout': 2, 'error': 3}[outcome['status']])
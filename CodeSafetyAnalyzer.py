@@ -1,11 +1,15 @@
 import ast
 import re
-from typing import List, Dict, Set, Optional
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Set, Optional
 from dataclasses import dataclass
 from pathlib import Path
 import logging
 
-@dataclass
+from IntervalIndex import IntervalIndex
+from SecretsDetector import SecretsDetector
+
+@dataclass(frozen=True)
 class CodePattern:
     """Represents a code pattern with associated risk metrics"""
     name: str
@@ -14,65 +18,102 @@ class CodePattern:
     remediation: str
     category: str
 
+# Shared, read-only pattern table used by every analyzer instance and thread
+PATTERNS = MappingProxyType({
+    'hardcoded_credentials': CodePattern(
+        name='Hardcoded Credentials',
+        description='Credentials or secrets directly embedded in code',
+        risk_level='high',
+        remediation='Use environment variables or secure secret management',
+        category='security'
+    ),
+    'high_entropy_secret': CodePattern(
+        name='High-Entropy Secret',
+        description='String constant that looks like a generated key or token',
+        risk_level='high',
+        remediation='Use environment variables or secure secret management',
+        category='security'
+    ),
+    'unsafe_deserialization': CodePattern(
+        name='Unsafe Deserialization',
+        description='Direct deserialization of untrusted data',
+        risk_level='high',
+        remediation='Implement proper input validation and sanitization',
+        category='security'
+    ),
+    'sql_concatenation': CodePattern(
+        name='SQL String Concatenation',
+        description='Direct string concatenation in SQL queries',
+        risk_level='high',
+        remediation='Use parameterized queries or ORM',
+        category='security'
+    ),
+    'file_path_manipulation': CodePattern(
+        name='Unsafe File Path Handling',
+        description='Insufficient validation of file paths',
+        risk_level='medium',
+        remediation='Use path sanitization and access control',
+        category='security'
+    ),
+    'debug_info': CodePattern(
+        name='Debug Information',
+        description='Debug/trace information in production code',
+        risk_level='low',
+        remediation='Remove or disable debug code in production',
+        category='best_practice'
+    ),
+    'error_suppression': CodePattern(
+        name='Broad Error Suppression',
+        description='Catching all exceptions without proper handling',
+        risk_level='medium',
+        remediation='Catch specific exceptions and handle appropriately',
+        category='reliability'
+    )
+})
+
+# CodeVisitor attribute holding each pattern's locations, in reporting order;
+# None marks patterns scored after the traversal
+PATTERN_LOCATIONS = MappingProxyType({
+    'hardcoded_credentials': 'credential_locations',
+    'high_entropy_secret': None,
+    'unsafe_deserialization': 'deserialization_locations',
+    'sql_concatenation': 'sql_locations',
+    'file_path_manipulation': 'file_op_locations',
+    'debug_info': 'debug_locations',
+    'error_suppression': 'exception_locations'
+})
+
 class CodeSafetyAnalyzer:
+    """
+    Safety pattern analyzer
+
+    Instances are safe to share between threads: the pattern table is
+    immutable and every analyze_code call works on its own visitor.
+    """
+
     def __init__(self):
         self.logger = self._setup_logger()
         self.patterns = self._initialize_patterns()
+        self.secrets_detector = SecretsDetector()
+
+    def __getstate__(self) -> Dict:
+        """Pickle support for process workers (mapping proxies cannot be pickled)"""
+        state = self.__dict__.copy()
+        state['patterns'] = dict(self.patterns)
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        """Restore the read-only pattern table after unpickling"""
+        state['patterns'] = MappingProxyType(state['patterns'])
+        self.__dict__.update(state)
 
     def _setup_logger(self) -> logging.Logger:
-        """Configure logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        """Get the module logger (handlers are configured by the application)"""
         return logging.getLogger(__name__)
 
-    def _initialize_patterns(self) -> Dict[str, CodePattern]:
-        """Initialize known code patterns to check"""
-        return {
-            'hardcoded_credentials': CodePattern(
-                name='Hardcoded Credentials',
-                description='Credentials or secrets directly embedded in code',
-                risk_level='high',
-                remediation='Use environment variables or secure secret management',
-                category='security'
-            ),
-            'unsafe_deserialization': CodePattern(
-                name='Unsafe Deserialization',
-                description='Direct deserialization of untrusted data',
-                risk_level='high',
-                remediation='Implement proper input validation and sanitization',
-                category='security'
-            ),
-            'sql_concatenation': CodePattern(
-                name='SQL String Concatenation',
-                description='Direct string concatenation in SQL queries',
-                risk_level='high',
-                remediation='Use parameterized queries or ORM',
-                category='security'
-            ),
-            'file_path_manipulation': CodePattern(
-                name='Unsafe File Path Handling',
-                description='Insufficient validation of file paths',
-                risk_level='medium',
-                remediation='Use path sanitization and access control',
-                category='security'
-            ),
-            'debug_info': CodePattern(
-                name='Debug Information',
-                description='Debug/trace information in production code',
-                risk_level='low',
-                remediation='Remove or disable debug code in production',
-                category='best_practice'
-            ),
-            'error_suppression': CodePattern(
-                name='Broad Error Suppression',
-                description='Catching all exceptions without proper handling',
-                risk_level='medium',
-                remediation='Catch specific exceptions and handle appropriately',
-                category='reliability'
-            )
-        }
+    def _initialize_patterns(self) -> Mapping[str, CodePattern]:
+        """Return the shared table of known code patterns to check"""
+        return PATTERNS
 
     def analyze_code(self, code: str) -> Dict:
         """
@@ -102,6 +143,10 @@ class CodeSafetyAnalyzer:
             
             # Generate recommendations
             self._generate_recommendations(results)
+
+            results['location_index'] = self._build_location_index(
+                visitor, results['findings']
+            ).to_dict()
             
             return results
             
@@ -124,7 +169,8 @@ class CodeSafetyAnalyzer:
         
         # Count functions and classes
         metrics['number_of_functions'] = len([node for node in ast.walk(tree) 
-                                            if isinstance(node, ast.FunctionDef)])
+                                            if isinstance(node, (ast.FunctionDef,
+                                                                 ast.AsyncFunctionDef))])
         metrics['number_of_classes'] = len([node for node in ast.walk(tree) 
                                           if isinstance(node, ast.ClassDef)])
         
@@ -139,47 +185,38 @@ class CodeSafetyAnalyzer:
                          results: Dict) -> None:
         """Analyze code patterns based on AST visitor results"""
         
-        # Check for hardcoded credentials
-        if visitor.has_hardcoded_credentials:
-            results['findings'].append({
-                'pattern': self.patterns['hardcoded_credentials'],
-                'locations': visitor.credential_locations
-            })
+        for key, attr in PATTERN_LOCATIONS.items():
+            if attr is None:
+                locations = self._secret_locations(visitor)
+            else:
+                locations = getattr(visitor, attr)
+            if locations:
+                results['findings'].append({
+                    'pattern': self.patterns[key],
+                    'locations': locations
+                })
 
-        # Check for unsafe deserialization
-        if visitor.has_unsafe_deserialization:
-            results['findings'].append({
-                'pattern': self.patterns['unsafe_deserialization'],
-                'locations': visitor.deserialization_locations
-            })
-
-        # Check for SQL string concatenation
-        if visitor.has_sql_concatenation:
-            results['findings'].append({
-                'pattern': self.patterns['sql_concatenation'],
-                'locations': visitor.sql_locations
-            })
-
-        # Check for unsafe file operations
-        if visitor.has_unsafe_file_ops:
-            results['findings'].append({
-                'pattern': self.patterns['file_path_manipulation'],
-                'locations': visitor.file_op_locations
-            })
-
-        # Check for debug information
-        if visitor.has_debug_info:
-            results['findings'].append({
-                'pattern': self.patterns['debug_info'],
-                'locations': visitor.debug_locations
-            })
+    def _secret_locations(self, visitor: 'CodeVisitor') -> List[int]:
+        """Score string constants in one batch, skipping lines already flagged as credentials"""
+        flagged = set(visitor.credential_locations)
+        return [s['line'] for s in self.secrets_detector.scan(visitor.string_constants)
+                if s['line'] not in flagged]
 
-        # Check error handling
-        if visitor.has_broad_exception_handling:
-            results['findings'].append({
-                'pattern': self.patterns['error_suppression'],
-                'locations': visitor.exception_locations
-            })
+    def _build_location_index(self, visitor: 'CodeVisitor',
+                              findings: List[Dict]) -> IntervalIndex:
+        """Index function spans and finding locations by line for range queries"""
+        pattern_keys = {p.name: k for k, p in self.patterns.items()}
+        points = []
+        for finding in findings:
+            pattern = finding['pattern']
+            for line in finding['locations']:
+                points.append({
+                    'kind': 'finding',
+                    'pattern': pattern_keys.get(pattern.name, pattern.name),
+                    'risk_level': pattern.risk_level,
+                    'line': line
+                })
+        return IntervalIndex(visitor.function_spans, points)
 
     def _generate_recommendations(self, results: Dict) -> None:
         """Generate security recommendations based on findings"""
@@ -220,8 +257,76 @@ class CodeVisitor(ast.NodeVisitor):
         self.debug_locations = []
         self.exception_locations = []
 
+        self.function_spans = []
+        self.string_constants = []
+        self.scopes = []
+        self._constant_names = {}
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        """Visit class definition nodes"""
+        self.scopes.append('class')
+        self.generic_visit(node)
+        self.scopes.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        """Visit function definition nodes"""
+        self.function_spans.append({
+            'name': node.name,
+            'start_line': node.lineno,
+            'end_line': getattr(node, 'end_lineno', None) or node.lineno
+        })
+        self.scopes.append('function')
+        self.generic_visit(node)
+        self.scopes.pop()
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        """Visit async function definitions like regular ones"""
+        self.visit_FunctionDef(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        """Gather string constants, with the name they are bound to if any"""
+        if isinstance(node.value, str):
+            name, context = self._constant_names.pop(id(node), (None, 'literal'))
+            self.string_constants.append({
+                'value': node.value,
+                'line': node.lineno,
+                'name': name,
+                'context': context
+            })
+
+    def _name_constant(self, value: ast.AST, name: Optional[str], context: str):
+        """Remember the name a string constant is bound to until it is visited"""
+        if name and isinstance(value, ast.Constant) and isinstance(value.value, str):
+            self._constant_names[id(value)] = (name, context)
+
+    def _target_name(self, target: ast.AST) -> Optional[str]:
+        """Get the bound name of a simple assignment target"""
+        if isinstance(target, ast.Name):
+            return target.id
+        if isinstance(target, ast.Attribute):
+            return target.attr
+        return None
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        """Visit annotated assignment nodes"""
+        if node.value is not None:
+            context = 'class_attribute' if self.scopes[-1:] == ['class'] else 'assignment'
+            self._name_constant(node.value, self._target_name(node.target), context)
+        self.generic_visit(node)
+
+    def visit_Dict(self, node: ast.Dict):
+        """Visit dict literal nodes"""
+        for key, value in zip(node.keys, node.values):
+            if isinstance(key, ast.Constant) and isinstance(key.value, str):
+                self._name_constant(value, key.value, 'dict_entry')
+        self.generic_visit(node)
+
     def visit_Assign(self, node: ast.Assign):
         """Visit assignment nodes"""
+        context = 'class_attribute' if self.scopes[-1:] == ['class'] else 'assignment'
+        for target in node.targets:
+            self._name_constant(node.value, self._target_name(target), context)
+
         # Check for potential hardcoded credentials
         for target in node.targets:
             if isinstance(target, ast.Name):
@@ -248,6 +353,9 @@ class CodeVisitor(ast.NodeVisitor):
                 self.has_debug_info = True
                 self.debug_locations.append(node.lineno)
 
+        for keyword in node.keywords:
+            self._name_constant(keyword.value, keyword.arg, 'keyword_argument')
+
         self.generic_visit(node)
 
     def visit_BinOp(self, node: ast.BinOp):
@@ -318,6 +426,10 @@ class ComplexityVisitor(ast.NodeVisitor):
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     analyzer = CodeSafetyAnalyzer()
     
     # Example code to analyze
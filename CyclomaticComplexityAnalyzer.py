@@ -4,6 +4,8 @@ from dataclasses import dataclass
 import logging
 from pathlib import Path
 
+from IntervalIndex import IntervalIndex
+
 @dataclass
 class ComplexityMetric:
     """Represents complexity metrics for a code unit"""
@@ -13,8 +15,17 @@ class ComplexityMetric:
     type: str  # 'function' or 'class'
     nested_depth: int
     decision_points: List[Dict]
+    end_line_number: Optional[int] = None
+    qualified_name: Optional[str] = None  # e.g. 'Outer.method'
 
 class CyclomaticComplexityAnalyzer:
+    """
+    Cyclomatic complexity analyzer
+
+    Instances are safe to share between threads: thresholds are read-only
+    after construction and every analyze_code call works on its own visitor.
+    """
+
     def __init__(self, threshold_warning: int = 10, threshold_critical: int = 15):
         """
         Initialize the analyzer with complexity thresholds
@@ -23,16 +34,22 @@ class CyclomaticComplexityAnalyzer:
             threshold_warning: Complexity level that triggers a warning
             threshold_critical: Complexity level that triggers a critical alert
         """
-        self.threshold_warning = threshold_warning
-        self.threshold_critical = threshold_critical
+        self._threshold_warning = threshold_warning
+        self._threshold_critical = threshold_critical
         self.logger = self._setup_logger()
 
+    @property
+    def threshold_warning(self) -> int:
+        """Complexity level that triggers a warning"""
+        return self._threshold_warning
+
+    @property
+    def threshold_critical(self) -> int:
+        """Complexity level that triggers a critical alert"""
+        return self._threshold_critical
+
     def _setup_logger(self) -> logging.Logger:
-        """Configure logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        """Get the module logger (handlers are configured by the application)"""
         return logging.getLogger(__name__)
 
     def analyze_code(self, code: str) -> Dict:
@@ -72,7 +89,10 @@ class CyclomaticComplexityAnalyzer:
                 'details': self._generate_detailed_report(visitor.metrics),
                 'decision_point_summary': self._summarize_decision_points(
                     visitor.all_decision_points
-                )
+                ),
+                'location_index': self._build_location_index(
+                    visitor.metrics, visitor.all_decision_points
+                ).to_dict()
             }
             
             return analysis
@@ -97,8 +117,10 @@ class CyclomaticComplexityAnalyzer:
             if severity != 'normal':
                 hotspots.append({
                     'name': metric.name,
+                    'qualified_name': metric.qualified_name,
                     'complexity': metric.complexity,
                     'line_number': metric.line_number,
+                    'end_line_number': metric.end_line_number,
                     'type': metric.type,
                     'severity': severity,
                     'nested_depth': metric.nested_depth,
@@ -174,14 +196,35 @@ class CyclomaticComplexityAnalyzer:
         """Generate detailed complexity report for each code unit"""
         return [{
             'name': m.name,
+            'qualified_name': m.qualified_name,
             'type': m.type,
             'complexity': m.complexity,
             'line_number': m.line_number,
+            'end_line_number': m.end_line_number,
             'nested_depth': m.nested_depth,
             'severity': self._determine_severity(m.complexity),
             'decision_points': self._format_decision_points(m.decision_points)
         } for m in metrics]
 
+    def _build_location_index(self, metrics: List[ComplexityMetric],
+                              decision_points: List[Dict]) -> IntervalIndex:
+        """Index code unit spans and decision points by line for range queries"""
+        spans = [{
+            'name': m.name,
+            'qualified_name': m.qualified_name,
+            'type': m.type,
+            'start_line': m.line_number,
+            'end_line': m.end_line_number or m.line_number,
+            'complexity': m.complexity,
+            'severity': self._determine_severity(m.complexity)
+        } for m in metrics]
+        points = [{
+            'kind': 'decision_point',
+            'type': d['type'],
+            'line': d['line']
+        } for d in decision_points]
+        return IntervalIndex(spans, points)
+
     def _format_decision_points(self, decision_points: List[Dict]) -> List[Dict]:
         """Format decision points for reporting"""
         return [{
@@ -271,6 +314,7 @@ class ComplexityVisitor(ast.NodeVisitor):
         self.current_function = None
         self.current_class = None
         self.nested_depth = 0
+        self.scope = []  # names of enclosing classes and functions
         self.all_decision_points = []
         self.current_decision_points = []
 
@@ -279,10 +323,12 @@ class ComplexityVisitor(ast.NodeVisitor):
         previous_class = self.current_class
         self.current_class = node.name
         self.nested_depth += 1
+        self.scope.append(node.name)
         
         # Visit all nodes in the class
         self.generic_visit(node)
         
+        self.scope.pop()
         self.nested_depth -= 1
         self.current_class = previous_class
 
@@ -295,9 +341,12 @@ class ComplexityVisitor(ast.NodeVisitor):
         self.current_decision_points = []
         start_complexity = self.total_complexity
         self.nested_depth += 1
+        qualified_name = '.'.join(self.scope + [node.name])
+        self.scope.append(node.name)
         
         # Visit all nodes in the function
         self.generic_visit(node)
+        self.scope.pop()
         
         # Calculate function complexity
         function_complexity = self.total_complexity - start_complexity + 1
@@ -309,13 +358,19 @@ class ComplexityVisitor(ast.NodeVisitor):
             line_number=node.lineno,
             type='function',
             nested_depth=self.nested_depth,
-            decision_points=self.current_decision_points.copy()
+            decision_points=self.current_decision_points.copy(),
+            end_line_number=getattr(node, 'end_lineno', None),
+            qualified_name=qualified_name
         ))
         
         self.nested_depth -= 1
         self.current_function = previous_function
         self.current_decision_points = previous_points
 
+    def visit_AsyncFunctionDef(self, node):
+        """Visit async function definition like a regular one"""
+        self.visit_FunctionDef(node)
+
     def _add_decision_point(self, node: ast.AST, decision_type: str):
         """Record a decision point"""
         point = {
@@ -360,6 +415,10 @@ class ComplexityVisitor(ast.NodeVisitor):
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     analyzer = CyclomaticComplexityAnalyzer()
     
     # Example code to analyze
@@ -0,0 +1,352 @@
+import codecs
+import re
+import subprocess
+import logging
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+from CyclomaticComplexityAnalyzer import CyclomaticComplexityAnalyzer
+from CodeSafetyAnalyzer import CodeSafetyAnalyzer
+from IntervalIndex import IntervalIndex
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+@dataclass
+class FileDelta:
+    """Represents a changed Python file between two revisions"""
+    old_path: Optional[str]  # None for added files
+    new_path: Optional[str]  # None for deleted files
+    changed_ranges: List[Tuple[int, int]] = field(default_factory=list)
+    added_ranges: List[Tuple[int, int]] = field(default_factory=list)  # lines present only in head
+
+class DeltaAnalyzer:
+    def __init__(self, repo_path: str = '.',
+                 complexity_analyzer: Optional[CyclomaticComplexityAnalyzer] = None,
+                 safety_analyzer: Optional[CodeSafetyAnalyzer] = None):
+        """
+        Initialize the delta analyzer for a git working copy
+
+        Args:
+            repo_path: Path inside the git repository to compare
+            complexity_analyzer: Analyzer used for hotspots (default thresholds if omitted)
+            safety_analyzer: Analyzer used for safety findings
+        """
+        self.repo_path = repo_path
+        self.complexity_analyzer = complexity_analyzer or CyclomaticComplexityAnalyzer()
+        self.safety_analyzer = safety_analyzer or CodeSafetyAnalyzer()
+        self.logger = logging.getLogger(__name__)
+
+    def analyze_delta(self, base: str, head: str = 'HEAD',
+                      use_merge_base: bool = True) -> Dict:
+        """
+        Analyze only what changed between two revisions
+
+        Files that do not differ are never read or parsed; their baseline
+        results carry over unchanged, so the cost follows the size of the diff.
+
+        Args:
+            base: Baseline revision (e.g. the merge target)
+            head: Revision under review
+            use_merge_base: Compare against the merge base of base and head, so
+                changes made on the target branch since the fork are ignored
+
+        Returns:
+            Dictionary containing new, removed and worsened hotspots and new
+            safety finding locations
+        """
+        requested_base = base
+        if use_merge_base:
+            try:
+                base = self._git('merge-base', base, head).decode('ascii').strip()
+            except (OSError, subprocess.CalledProcessError) as e:
+                self.logger.error(f"Failed to find merge base: {e}")
+                return {'error': 'Git merge-base failed'}
+
+        try:
+            deltas = self._parse_diff(self._git('diff', '-U0', '--no-color', '--no-ext-diff',
+                                                '-M', base, head, '--', '*.py'))
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.logger.error(f"Failed to diff revisions: {e}")
+            return {'error': 'Git diff failed'}
+
+        # Read every needed blob in a single git process
+        specs = []
+        for delta in deltas:
+            if delta.old_path:
+                specs.append(f'{base}:{delta.old_path}')
+            if delta.new_path:
+                specs.append(f'{head}:{delta.new_path}')
+        try:
+            blobs = self._read_blobs(specs)
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.logger.error(f"Failed to read revisions: {e}")
+            return {'error': 'Git object read failed'}
+
+        report = {
+            'base': requested_base,
+            'merge_base': base if use_merge_base else None,
+            'head': head,
+            'files_analyzed': len(deltas),
+            'files': [],
+            'new_hotspots': [],
+            'removed_hotspots': [],
+            'worsened_hotspots': [],
+            'new_findings': [],
+            'errors': []
+        }
+
+        for delta in deltas:
+            base_source = blobs.get(f'{base}:{delta.old_path}') if delta.old_path else None
+            head_source = blobs.get(f'{head}:{delta.new_path}') if delta.new_path else None
+            self._analyze_file_delta(delta, base_source, head_source, report)
+
+        report['new_hotspots'].sort(key=self._hotspot_sort_key)
+        report['removed_hotspots'].sort(key=self._hotspot_sort_key)
+        report['worsened_hotspots'].sort(key=self._hotspot_sort_key)
+        report['new_findings'].sort(key=lambda f: (f['path'], f['line'], f['pattern']))
+        return report
+
+    def _analyze_file_delta(self, delta: FileDelta, base_source: Optional[str],
+                            head_source: Optional[str], report: Dict) -> None:
+        """Compare one changed file and record its contribution to the report"""
+        path = delta.new_path or delta.old_path
+
+        base_results = self._complexity_results(base_source, delta.old_path, 'base', report)
+        head_results = self._complexity_results(head_source, delta.new_path, 'head', report)
+        if base_results is None or head_results is None:
+            return
+        base_details = base_results.get('details', [])
+        head_details = head_results.get('details', [])
+        head_index = (IntervalIndex.from_dict(head_results['location_index'])
+                      if head_results else IntervalIndex())
+
+        changed_functions = []
+        for start, end in delta.changed_ranges:
+            for span in head_index.spans_in_range(start, end):
+                name = span.get('qualified_name') or span['name']
+                if name not in changed_functions:
+                    changed_functions.append(name)
+        report['files'].append({
+            'path': path,
+            'old_path': delta.old_path,
+            'status': self._status(delta),
+            'changed_ranges': [list(r) for r in delta.changed_ranges],
+            'changed_functions': changed_functions
+        })
+
+        # Pair functions across revisions by qualified name
+        base_units = self._keyed_units(base_details)
+        head_units = self._keyed_units(head_details)
+
+        for key, head_unit in head_units.items():
+            if head_unit['severity'] == 'normal':
+                continue
+            base_unit = base_units.get(key)
+            entry = self._hotspot_entry(path, head_unit)
+            if base_unit is None or base_unit['severity'] == 'normal':
+                report['new_hotspots'].append(entry)
+            elif head_unit['complexity'] > base_unit['complexity']:
+                entry['base_complexity'] = base_unit['complexity']
+                entry['base_severity'] = base_unit['severity']
+                report['worsened_hotspots'].append(entry)
+
+        for key, base_unit in base_units.items():
+            if base_unit['severity'] == 'normal':
+                continue
+            head_unit = head_units.get(key)
+            if head_unit is None or head_unit['severity'] == 'normal':
+                report['removed_hotspots'].append(
+                    self._hotspot_entry(delta.old_path, base_unit))
+
+        if head_source is not None:
+            self._collect_new_findings(path, head_source, head_index,
+                                       delta.added_ranges, report)
+
+    def _complexity_results(self, source: Optional[str], path: Optional[str],
+                            side: str, report: Dict) -> Optional[Dict]:
+        """Run the complexity analyzer on one side of a file delta"""
+        if source is None:
+            return {}
+        results = self.complexity_analyzer.analyze_code(source)
+        if 'error' in results:
+            report['errors'].append({'path': path, 'revision': side, 'error': results['error']})
+            return None
+        return results
+
+    def _collect_new_findings(self, path: str, source: str, index: IntervalIndex,
+                              added_ranges: List[Tuple[int, int]], report: Dict) -> None:
+        """Record safety findings located on lines introduced by the change"""
+        results = self.safety_analyzer.analyze_code(source)
+        if 'error' in results:
+            report['errors'].append({'path': path, 'revision': 'head', 'error': results['error']})
+            return
+
+        findings = IntervalIndex.from_dict(results['location_index'])
+        for start, end in added_ranges:
+            for point in findings.points_in_range(start, end, kind='finding'):
+                enclosing = index.innermost_span(point['line'])
+                report['new_findings'].append({
+                    'path': path,
+                    'pattern': point['pattern'],
+                    'risk_level': point['risk_level'],
+                    'line': point['line'],
+                    'function': (enclosing.get('qualified_name') or enclosing['name']
+                                 if enclosing else None)
+                })
+
+    def _keyed_units(self, details: List[Dict]) -> Dict[Tuple[str, int], Dict]:
+        """Key code units by class-qualified name, numbering only exact redefinitions"""
+        keyed = {}
+        seen = {}
+        for d in sorted(details, key=lambda x: x['line_number']):
+            name = d.get('qualified_name') or d['name']
+            ordinal = seen.get(name, 0)
+            seen[name] = ordinal + 1
+            keyed[(name, ordinal)] = d
+        return keyed
+
+    def _hotspot_entry(self, path: str, unit: Dict) -> Dict:
+        """Build a report entry for a hotspot"""
+        return {
+            'path': path,
+            'name': unit['name'],
+            'qualified_name': unit.get('qualified_name'),
+            'type': unit['type'],
+            'line_number': unit['line_number'],
+            'complexity': unit['complexity'],
+            'severity': unit['severity']
+        }
+
+    def _hotspot_sort_key(self, hotspot: Dict):
+        """Order hotspots by complexity, then location"""
+        return (-hotspot['complexity'], hotspot['path'], hotspot['line_number'])
+
+    def _status(self, delta: FileDelta) -> str:
+        if delta.old_path is None:
+            return 'added'
+        if delta.new_path is None:
+            return 'deleted'
+        if delta.old_path != delta.new_path:
+            return 'renamed'
+        return 'modified'
+
+    def _git(self, *args: str, input_data: Optional[bytes] = None) -> bytes:
+        """Run a git command in the repository and return its raw output"""
+        return subprocess.run(
+            ['git', '-C', self.repo_path, '-c', 'core.quotepath=off', *args],
+            input=input_data, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            check=True
+        ).stdout
+
+    def _read_blobs(self, specs: List[str]) -> Dict[str, str]:
+        """Read several '<rev>:<path>' blobs through one cat-file process"""
+        if not specs:
+            return {}
+        output = self._git('cat-file', '--batch',
+                           input_data=''.join(f'{s}\n' for s in specs).encode('utf-8'))
+        blobs = {}
+        pos = 0
+        for spec in specs:
+            newline = output.index(b'\n', pos)
+            header = output[pos:newline].split()
+            pos = newline + 1
+            if len(header) < 3 or header[1] != b'blob':
+                continue  # missing object
+            size = int(header[2])
+            blobs[spec] = output[pos:pos + size].decode('utf-8', errors='replace')
+            pos += size + 1
+        return blobs
+
+    def _parse_diff(self, diff: bytes) -> List[FileDelta]:
+        """Parse zero-context unified diff output into per-file changed line ranges"""
+        deltas = []
+        current = None
+        in_header = False  # between 'diff --git' and the file's first hunk
+        for raw_line in diff.decode('utf-8', errors='replace').split('\n'):
+            if raw_line.startswith('diff --git '):
+                current = None
+                in_header = True
+            elif in_header and raw_line.startswith('--- '):
+                current = FileDelta(old_path=self._diff_path(raw_line[4:], 'a/'),
+                                    new_path=None)
+            elif in_header and raw_line.startswith('+++ ') and current is not None:
+                current.new_path = self._diff_path(raw_line[4:], 'b/')
+                deltas.append(current)
+            elif raw_line.startswith('@@') and current is not None:
+                in_header = False
+                match = HUNK_HEADER.match(raw_line)
+                if not match:
+                    continue
+                start = int(match.group(3))
+                count = int(match.group(4)) if match.group(4) is not None else 1
+                if count == 0:
+                    # Pure deletion: mark the line the removal happened after so the
+                    # enclosing function counts as changed, but no line was added
+                    current.changed_ranges.append((max(start, 1), max(start, 1)))
+                else:
+                    current.changed_ranges.append((start, start + count - 1))
+                    current.added_ranges.append((start, start + count - 1))
+        return deltas
+
+    def _diff_path(self, value: str, prefix: str) -> Optional[str]:
+        """Decode a path from a ---/+++ diff header line"""
+        value = value.rstrip('\t')
+        if value == '/dev/null':
+            return None
+        if value.startswith('"') and value.endswith('"'):
+            value = codecs.escape_decode(value[1:-1])[0].decode('utf-8', errors='replace')
+        return value[len(prefix):] if value.startswith(prefix) else value
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Analyze only what changed between two revisions')
+    parser.add_argument('base', help='baseline revision')
+    parser.add_argument('head', nargs='?', default='HEAD', help='revision under review')
+    parser.add_argument('--repo', default='.', help='path to the git repository')
+    parser.add_argument('--two-dot', action='store_true',
+                        help='diff base and head directly instead of from their merge base')
+    args = parser.parse_args()
+
+    report = DeltaAnalyzer(args.repo).analyze_delta(args.base, args.head,
+                                                    use_merge_base=not args.two_dot)
+    if 'error' in report:
+        print(report['error'])
+        sys.exit(2)
+
+    print(f"\nDelta Analysis ({report['base']}..{report['head']}):")
+    print("-" * 50)
+    print(f"Files analyzed: {report['files_analyzed']}")
+
+    for title, key in (('New Hotspots', 'new_hotspots'),
+                       ('Worsened Hotspots', 'worsened_hotspots'),
+                       ('Removed Hotspots', 'removed_hotspots')):
+        print(f"\n{title}:")
+        for hotspot in report[key]:
+            change = ''
+            if 'base_complexity' in hotspot:
+                change = f" (was {hotspot['base_complexity']}, {hotspot['base_severity']})"
+            print(f"- {hotspot['path']}:{hotspot['line_number']} {hotspot['qualified_name']} "
+                  f"complexity {hotspot['complexity']} [{hotspot['severity']}]{change}")
+
+    print("\nNew Findings:")
+    for finding in report['new_findings']:
+        where = f" in {finding['function']}" if finding['function'] else ''
+        print(f"- {finding['path']}:{finding['line']} {finding['pattern']} "
+              f"(Risk Level: {finding['risk_level']}){where}")
+
+    if report['errors']:
+        print(f"\nErrors: {len(report['errors'])}")
+        for error in report['errors']:
+            print(f"- {error['path']} ({error['revision']}): {error['error']}")
+
+    gate_failed = report['new_hotspots'] or report['worsened_hotspots'] or report['new_findings']
+    # Files that cannot be analyzed must not let the change through
+    sys.exit(1 if gate_failed else 3 if report['errors'] else 0)
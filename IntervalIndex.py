@@ -0,0 +1,155 @@
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional
+
+class IntervalIndex:
+    """
+    Sorted index over code spans (start/end lines) and point locations
+
+    Spans are expected to nest or be disjoint, as function and class bodies
+    do; a span that overhangs its enclosing span is clipped to it. Lookups
+    use binary search over precomputed boundaries, and the precomputed form
+    round-trips through to_dict/from_dict without re-sorting.
+    """
+
+    def __init__(self, spans: Optional[List[Dict]] = None,
+                 points: Optional[List[Dict]] = None):
+        """
+        Build the index
+
+        Args:
+            spans: Dicts with 'start_line' and 'end_line' plus any payload
+            points: Dicts with 'line' plus any payload
+        """
+        self._spans = sorted(spans or [], key=lambda s: (s['start_line'], -s['end_line']))
+        self._points = sorted(points or [], key=lambda p: p['line'])
+        self._parents, self._bounds, self._owners = self._build_segments(self._spans)
+        self._refresh_keys()
+
+    def _build_segments(self, spans: List[Dict]):
+        """Compute parent links and the innermost-span owner of each line segment"""
+        parents = []
+        ends = []
+        bounds = []
+        owners = []
+        stack = []
+
+        def emit(position: int, owner: int):
+            if bounds and bounds[-1] == position:
+                owners[-1] = owner
+            else:
+                bounds.append(position)
+                owners.append(owner)
+
+        for i, span in enumerate(spans):
+            while stack and ends[stack[-1]] < span['start_line']:
+                closed = stack.pop()
+                emit(ends[closed] + 1, stack[-1] if stack else -1)
+            parent = stack[-1] if stack else -1
+            end = span['end_line']
+            if parent >= 0:
+                end = min(end, ends[parent])
+            parents.append(parent)
+            ends.append(end)
+            emit(span['start_line'], i)
+            stack.append(i)
+
+        while stack:
+            closed = stack.pop()
+            emit(ends[closed] + 1, stack[-1] if stack else -1)
+
+        return parents, bounds, owners
+
+    def _refresh_keys(self):
+        self._span_starts = [s['start_line'] for s in self._spans]
+        self._point_lines = [p['line'] for p in self._points]
+
+    def innermost_span(self, line: int) -> Optional[Dict]:
+        """Return the innermost span containing a line, if any"""
+        k = bisect_right(self._bounds, line) - 1
+        if k < 0 or self._owners[k] < 0:
+            return None
+        return self._spans[self._owners[k]]
+
+    def enclosing_spans(self, line: int) -> List[Dict]:
+        """Return all spans containing a line, innermost first"""
+        k = bisect_right(self._bounds, line) - 1
+        index = self._owners[k] if k >= 0 else -1
+        result = []
+        while index >= 0:
+            result.append(self._spans[index])
+            index = self._parents[index]
+        return result
+
+    def spans_in_range(self, start: int, end: int,
+                       predicate: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+        """Return spans overlapping lines start..end, ordered by start line"""
+        # A span overlaps the range if it contains `start` or begins inside the range
+        result = list(reversed(self.enclosing_spans(start)))
+        lo = bisect_right(self._span_starts, start)
+        hi = bisect_right(self._span_starts, end)
+        result.extend(self._spans[lo:hi])
+        if predicate is not None:
+            result = [s for s in result if predicate(s)]
+        return result
+
+    def points_in_range(self, start: int, end: int,
+                        kind: Optional[str] = None) -> List[Dict]:
+        """Return point locations on lines start..end, optionally of one kind"""
+        lo = bisect_left(self._point_lines, start)
+        hi = bisect_right(self._point_lines, end)
+        points = self._points[lo:hi]
+        if kind is not None:
+            points = [p for p in points if p.get('kind') == kind]
+        return points
+
+    def query(self, start: int, end: int) -> Dict:
+        """Return all spans and points that fall inside lines start..end"""
+        return {
+            'spans': self.spans_in_range(start, end),
+            'points': self.points_in_range(start, end)
+        }
+
+    def to_dict(self) -> Dict:
+        """Serialize the built index to plain JSON-compatible data"""
+        return {
+            'spans': self._spans,
+            'points': self._points,
+            'parents': self._parents,
+            'bounds': self._bounds,
+            'owners': self._owners
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'IntervalIndex':
+        """Restore an index produced by to_dict without rebuilding it"""
+        index = cls.__new__(cls)
+        index._spans = data['spans']
+        index._points = data['points']
+        index._parents = data['parents']
+        index._bounds = data['bounds']
+        index._owners = data['owners']
+        index._refresh_keys()
+        return index
+
+# Example usage
+if __name__ == "__main__":
+    index = IntervalIndex(
+        spans=[
+            {'name': 'Outer', 'start_line': 1, 'end_line': 20},
+            {'name': 'inner', 'start_line': 3, 'end_line': 8},
+            {'name': 'other', 'start_line': 10, 'end_line': 18}
+        ],
+        points=[
+            {'kind': 'decision_point', 'type': 'if', 'line': 4},
+            {'kind': 'finding', 'pattern': 'debug_info', 'line': 12}
+        ]
+    )
+
+    print("\nEnclosing spans of line 5:")
+    for span in index.enclosing_spans(5):
+        print(f"- {span['name']} ({span['start_line']}-{span['end_line']})")
+
+    print("\nLines 4-12:")
+    result = index.query(4, 12)
+    print(f"- spans: {[s['name'] for s in result['spans']]}")
+    print(f"- points: {[p['line'] for p in result['points']]}")
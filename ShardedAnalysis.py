@@ -0,0 +1,363 @@
+import hashlib
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from CyclomaticComplexityAnalyzer import CyclomaticComplexityAnalyzer
+from CodeSafetyAnalyzer import PATTERNS, CodeSafetyAnalyzer
+
+HISTOGRAM_BUCKET = 5  # width of function complexity histogram buckets
+TOP_K = 50
+
+def manifest_digest(paths: Iterable[str]) -> str:
+    """Fingerprint a manifest so shards of different manifests are never merged"""
+    digest = hashlib.sha1()
+    for path in sorted(set(paths)):
+        digest.update(path.encode('utf-8') + b'\n')
+    return digest.hexdigest()
+
+def shard_of(path: str, num_shards: int) -> int:
+    """Deterministically assign a path to a shard, independent of manifest order"""
+    return int(hashlib.sha1(path.encode('utf-8')).hexdigest()[:8], 16) % num_shards
+
+def partition_manifest(paths: Iterable[str], num_shards: int) -> List[List[str]]:
+    """Split a manifest into num_shards sorted, disjoint lists of paths"""
+    shards = [[] for _ in range(num_shards)]
+    for path in sorted(set(paths)):
+        shards[shard_of(path, num_shards)].append(path)
+    return shards
+
+def _hotspot_key(hotspot: Dict):
+    """Total order for hotspots: complexity, then location"""
+    return (-hotspot['complexity'], hotspot['path'], hotspot['line_number'], hotspot['name'])
+
+class PartialResult:
+    """
+    Aggregates for a subset of files that merge exactly
+
+    Only sums, counts, maxima, histograms, top-K lists and location sets are
+    kept, so merging partials in any order and grouping gives the same
+    report as analyzing every file in one run.
+    """
+
+    def __init__(self, top_k: int = TOP_K):
+        self.top_k = top_k
+        self.shards = []  # shard indices covered
+        self.num_shards = None
+        self.manifest = None  # manifest digest
+        self.files_analyzed = 0
+        self.errors = []
+        self.overall_complexity = 0
+        self.function_complexity_sum = 0
+        self.function_count = 0
+        self.max_complexity = 0
+        self.decision_type_counts = {}
+        self.complexity_histogram = {}
+        self.severity_counts = {}
+        self.hotspots = []
+        self.finding_locations = {}  # pattern key -> {path: set of lines}
+
+    def add_file(self, path: str, complexity_results: Dict, safety_results: Dict) -> None:
+        """Fold one file's analyzer results into the aggregates"""
+        for results in (complexity_results, safety_results):
+            if 'error' in results:
+                self.errors.append({'path': path, 'error': results['error']})
+                return
+        self.files_analyzed += 1
+
+        metrics = complexity_results['metrics']
+        self.overall_complexity += metrics['overall_complexity']
+        self.max_complexity = max(self.max_complexity, metrics['max_complexity'])
+        distributions = complexity_results['decision_point_summary']['distributions']
+        for decision_type, distribution in distributions.items():
+            self._count(self.decision_type_counts, decision_type, distribution['count'])
+
+        for detail in complexity_results['details']:
+            if detail['type'] == 'function':
+                self.function_complexity_sum += detail['complexity']
+                self.function_count += 1
+            bucket = (detail['complexity'] - 1) // HISTOGRAM_BUCKET * HISTOGRAM_BUCKET + 1
+            self._count(self.complexity_histogram, str(bucket), 1)
+            self._count(self.severity_counts, detail['severity'], 1)
+
+        self._add_hotspots([{
+            'path': path,
+            'name': h['name'],
+            'type': h['type'],
+            'line_number': h['line_number'],
+            'complexity': h['complexity'],
+            'severity': h['severity']
+        } for h in complexity_results['hotspots']])
+
+        for point in safety_results['location_index']['points']:
+            lines = self.finding_locations.setdefault(point['pattern'], {})
+            lines.setdefault(path, set()).add(point['line'])
+
+    def merge(self, other: 'PartialResult') -> 'PartialResult':
+        """Combine another partial into this one and return self"""
+        if self.top_k != other.top_k:
+            raise ValueError(f'Partials keep different hotspot counts '
+                             f'(top_k {self.top_k} vs {other.top_k})')
+        if self.num_shards is not None and other.num_shards is not None:
+            if (self.num_shards, self.manifest) != (other.num_shards, other.manifest):
+                raise ValueError('Partials come from different shard layouts or manifests')
+        self.num_shards = self.num_shards if self.num_shards is not None else other.num_shards
+        self.manifest = self.manifest if self.manifest is not None else other.manifest
+        overlap = set(self.shards) & set(other.shards)
+        if overlap:
+            raise ValueError(f'Shards merged twice: {sorted(overlap)}')
+        self.shards = sorted(self.shards + other.shards)
+
+        self.files_analyzed += other.files_analyzed
+        self.errors.extend(other.errors)
+        self.overall_complexity += other.overall_complexity
+        self.function_complexity_sum += other.function_complexity_sum
+        self.function_count += other.function_count
+        self.max_complexity = max(self.max_complexity, other.max_complexity)
+        for target, source in ((self.decision_type_counts, other.decision_type_counts),
+                               (self.complexity_histogram, other.complexity_histogram),
+                               (self.severity_counts, other.severity_counts)):
+            for key, count in source.items():
+                self._count(target, key, count)
+        self._add_hotspots(other.hotspots)
+        for pattern, paths in other.finding_locations.items():
+            target = self.finding_locations.setdefault(pattern, {})
+            for path, lines in paths.items():
+                target.setdefault(path, set()).update(lines)
+        return self
+
+    def _count(self, counts: Dict, key: str, amount: int) -> None:
+        """Add to a counter dict"""
+        counts[key] = counts.get(key, 0) + amount
+
+    def _add_hotspots(self, hotspots: List[Dict]) -> None:
+        """Keep only the top-K hotspots under a total, deterministic order"""
+        self.hotspots = sorted(self.hotspots + hotspots, key=_hotspot_key)[:self.top_k]
+
+    def to_dict(self) -> Dict:
+        """Serialize the partial to JSON-compatible data"""
+        return {
+            'top_k': self.top_k,
+            'shards': self.shards,
+            'num_shards': self.num_shards,
+            'manifest': self.manifest,
+            'files_analyzed': self.files_analyzed,
+            'errors': self.errors,
+            'overall_complexity': self.overall_complexity,
+            'function_complexity_sum': self.function_complexity_sum,
+            'function_count': self.function_count,
+            'max_complexity': self.max_complexity,
+            'decision_type_counts': self.decision_type_counts,
+            'complexity_histogram': self.complexity_histogram,
+            'severity_counts': self.severity_counts,
+            'hotspots': self.hotspots,
+            'finding_locations': {
+                pattern: {path: sorted(lines) for path, lines in paths.items()}
+                for pattern, paths in self.finding_locations.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PartialResult':
+        """Restore a partial produced by to_dict"""
+        partial = cls(top_k=data['top_k'])
+        for name in ('shards', 'num_shards', 'manifest', 'files_analyzed', 'errors',
+                     'overall_complexity', 'function_complexity_sum', 'function_count',
+                     'max_complexity', 'decision_type_counts', 'complexity_histogram',
+                     'severity_counts', 'hotspots'):
+            setattr(partial, name, data[name])
+        partial.finding_locations = {
+            pattern: {path: set(lines) for path, lines in paths.items()}
+            for pattern, paths in data['finding_locations'].items()
+        }
+        return partial
+
+    def finalize(self, patterns: Optional[Dict] = None) -> Dict:
+        """
+        Build the final report from the aggregates
+
+        Args:
+            patterns: Pattern table used to name findings (defaults to PATTERNS)
+
+        Returns:
+            Dictionary with repository-wide metrics, top hotspots and findings
+        """
+        patterns = patterns if patterns is not None else PATTERNS
+        total_points = sum(self.decision_type_counts.values())
+        findings = {}
+        for key in sorted(self.finding_locations):
+            pattern = patterns.get(key)
+            locations = {path: sorted(lines)
+                         for path, lines in sorted(self.finding_locations[key].items())}
+            findings[key] = {
+                'name': pattern.name if pattern else key,
+                'risk_level': pattern.risk_level if pattern else None,
+                'count': sum(len(lines) for lines in locations.values()),
+                'locations': locations
+            }
+
+        return {
+            'files_analyzed': self.files_analyzed,
+            'metrics': {
+                'overall_complexity': self.overall_complexity,
+                'average_function_complexity': (
+                    self.function_complexity_sum / self.function_count
+                    if self.function_count else 0.0
+                ),
+                'max_complexity': self.max_complexity,
+                'total_decision_points': total_points,
+                'unique_decision_types': len(self.decision_type_counts)
+            },
+            'decision_distributions': {
+                t: {'count': c, 'percentage': (c / total_points) * 100}
+                for t, c in sorted(self.decision_type_counts.items())
+            },
+            'complexity_histogram': {
+                k: self.complexity_histogram[k]
+                for k in sorted(self.complexity_histogram, key=int)
+            },
+            'severity_counts': dict(sorted(self.severity_counts.items())),
+            'top_hotspots': self.hotspots,
+            'findings': findings,
+            'errors': sorted(self.errors, key=lambda e: e['path'])
+        }
+
+def analyze_shard(manifest: List[str], shard_index: int, num_shards: int,
+                  complexity_analyzer: Optional[CyclomaticComplexityAnalyzer] = None,
+                  safety_analyzer: Optional[CodeSafetyAnalyzer] = None,
+                  top_k: int = TOP_K) -> PartialResult:
+    """
+    Analyze the files of one shard of a manifest
+
+    Args:
+        manifest: Every path in the run; only this shard's paths are read
+        shard_index: Index of the shard to analyze
+        num_shards: Total number of shards
+        complexity_analyzer: Analyzer used for complexity aggregates
+        safety_analyzer: Analyzer used for finding locations
+        top_k: Number of hotspots kept
+
+    Returns:
+        Partial result covering this shard
+    """
+    complexity_analyzer = complexity_analyzer or CyclomaticComplexityAnalyzer()
+    safety_analyzer = safety_analyzer or CodeSafetyAnalyzer()
+    logger = logging.getLogger(__name__)
+
+    partial = PartialResult(top_k=top_k)
+    partial.shards = [shard_index]
+    partial.num_shards = num_shards
+    partial.manifest = manifest_digest(manifest)
+
+    for path in partition_manifest(manifest, num_shards)[shard_index]:
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                code = f.read()
+        except OSError as e:
+            logger.error(f"Failed to read {path}: {e}")
+            partial.errors.append({'path': path, 'error': 'Unreadable file'})
+            continue
+        partial.add_file(path, complexity_analyzer.analyze_code(code),
+                         safety_analyzer.analyze_code(code))
+    return partial
+
+def merge_shards(partials: List[PartialResult]) -> PartialResult:
+    """Merge shard partials, checking that every shard is present exactly once"""
+    if not partials:
+        raise ValueError('No partial results to merge')
+    merged = PartialResult(top_k=partials[0].top_k)
+    for partial in partials:
+        merged.merge(partial)
+    missing = sorted(set(range(merged.num_shards)) - set(merged.shards))
+    if missing:
+        raise ValueError(f'Missing shards: {missing}')
+    return merged
+
+def _read_manifest(path: str) -> List[str]:
+    """Read one path per non-empty line"""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def _write_json(data: Dict, path: Optional[str]) -> None:
+    """Write JSON with stable key order to a file or stdout"""
+    text = json.dumps(data, indent=2, sort_keys=True)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+    import os
+    import subprocess
+    import sys
+    import tempfile
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Sharded multi-node analysis')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    shard_cmd = commands.add_parser('shard', help='analyze one shard of a manifest')
+    shard_cmd.add_argument('--manifest', required=True, help='file listing one path per line')
+    shard_cmd.add_argument('--shards', type=int, required=True)
+    shard_cmd.add_argument('--index', type=int, required=True)
+    shard_cmd.add_argument('--output', help='partial result JSON (default stdout)')
+
+    merge_cmd = commands.add_parser('merge', help='combine shard outputs into a report')
+    merge_cmd.add_argument('partials', nargs='+', help='partial result JSON files')
+    merge_cmd.add_argument('--output', help='report JSON (default stdout)')
+
+    local_cmd = commands.add_parser('local', help='run every shard as a local process and merge')
+    local_cmd.add_argument('--manifest', required=True)
+    local_cmd.add_argument('--shards', type=int, required=True)
+    local_cmd.add_argument('--output', help='report JSON (default stdout)')
+    local_cmd.add_argument('--verify', action='store_true',
+                           help='also run on a single node and compare the reports')
+
+    args = parser.parse_args()
+
+    if args.command == 'shard':
+        partial = analyze_shard(_read_manifest(args.manifest), args.index, args.shards)
+        _write_json(partial.to_dict(), args.output)
+
+    elif args.command == 'merge':
+        partials = []
+        for path in args.partials:
+            with open(path, encoding='utf-8') as f:
+                partials.append(PartialResult.from_dict(json.load(f)))
+        try:
+            merged = merge_shards(partials)
+        except ValueError as e:
+            print(f"Merge failed: {e}")
+            sys.exit(2)
+        _write_json(merged.finalize(), args.output)
+
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            outputs = [os.path.join(workdir, f'shard-{i}.json') for i in range(args.shards)]
+            nodes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), 'shard',
+                                       '--manifest', args.manifest, '--shards', str(args.shards),
+                                       '--index', str(i), '--output', outputs[i]])
+                     for i in range(args.shards)]
+            if any(node.wait() != 0 for node in nodes):
+                print("A shard process failed")
+                sys.exit(2)
+            partials = []
+            for output in outputs:
+                with open(output, encoding='utf-8') as f:
+                    partials.append(PartialResult.from_dict(json.load(f)))
+        report = merge_shards(partials).finalize()
+        _write_json(report, args.output)
+
+        if args.verify:
+            single = analyze_shard(_read_manifest(args.manifest), 0, 1).finalize()
+            identical = (json.dumps(single, sort_keys=True) ==
+                         json.dumps(report, sort_keys=True))
+            print(f"Single-node report identical: {identical}", file=sys.stderr)
+            sys.exit(0 if identical else 1)
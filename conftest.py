@@ -0,0 +1,12 @@
+import pytest
+
+def make_branchy(name, branches, indent=0, params='x'):
+    """Source of a function with one if statement per branch (complexity branches + 1)"""
+    pad = ' ' * indent
+    body = ''.join(f"{pad}    if x == {i}:\n{pad}        x += 1\n" for i in range(branches))
+    return f"{pad}def {name}({params}):\n{body}{pad}    return x\n"
+
+@pytest.fixture
+def branchy():
+    """Build branchy function source for complexity tests"""
+    return make_branchy
@@ -0,0 +1,128 @@
+import subprocess
+import sys
+
+import pytest
+
+from CyclomaticComplexityAnalyzer import CyclomaticComplexityAnalyzer
+import DeltaAnalyzer as delta_module
+from DeltaAnalyzer import DeltaAnalyzer
+
+def _git(repo, *args):
+    return subprocess.run(['git', '-C', str(repo), *args], check=True,
+                          stdout=subprocess.PIPE, text=True).stdout.strip()
+
+def _commit(repo, files, message):
+    for name, content in files.items():
+        (repo / name).write_text(content)
+    _git(repo, 'add', '-A')
+    _git(repo, 'commit', '-q', '-m', message)
+    return _git(repo, 'rev-parse', 'HEAD')
+
+def _method(branchy, name, branches):
+    return branchy(name, branches, indent=4, params='self, x')
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, 'init', '-q', '-b', 'main')
+    _git(tmp_path, 'config', 'user.email', 'dev@example.com')
+    _git(tmp_path, 'config', 'user.name', 'dev')
+    return tmp_path
+
+def test_removed_line_starting_with_dashes_keeps_later_hunks(repo):
+    base = _commit(repo, {'a.py': (
+        'def f():\n'
+        '    """\n'
+        '-- legacy SQL comment\n'
+        '    """\n'
+        '    return 1\n'
+        '\n'
+        'def g(x):\n'
+        '    return x\n'
+    )}, 'base')
+    _commit(repo, {'a.py': (
+        'def f():\n'
+        '    """\n'
+        '    """\n'
+        '    return 1\n'
+        '\n'
+        'def g(x):\n'
+        '    print(x)\n'
+        '    return x\n'
+    )}, 'head')
+
+    report = DeltaAnalyzer(str(repo)).analyze_delta(base)
+
+    assert [(f['pattern'], f['line'], f['function']) for f in report['new_findings']] == [
+        ('debug_info', 7, 'g')
+    ]
+
+def test_same_named_method_added_above_is_paired_by_class(repo, branchy):
+    base = _commit(repo, {'m.py': 'class A:\n' + _method(branchy, 'run', 11)}, 'base')
+    _commit(repo, {'m.py': 'class Z:\n' + _method(branchy, 'run', 11) + '\nclass A:\n'
+                   + _method(branchy, 'run', 11)}, 'head')
+
+    analyzer = DeltaAnalyzer(str(repo), CyclomaticComplexityAnalyzer(10, 15))
+    report = analyzer.analyze_delta(base)
+
+    assert [h['qualified_name'] for h in report['new_hotspots']] == ['Z.run']
+    assert report['removed_hotspots'] == []
+    assert report['worsened_hotspots'] == []
+
+def test_target_branch_changes_are_ignored_with_merge_base(repo, branchy):
+    fork = _commit(repo, {'t.py': 'class T:\n' + _method(branchy, 'hot', 11)}, 'fork point')
+    _git(repo, 'checkout', '-q', '-b', 'feature')
+    _commit(repo, {'f.py': 'def feature():\n    return 1\n'}, 'feature work')
+    _git(repo, 'checkout', '-q', 'main')
+    _commit(repo, {'t.py': 'class T:\n' + _method(branchy, 'hot', 1)}, 'target fixes hotspot')
+
+    analyzer = DeltaAnalyzer(str(repo), CyclomaticComplexityAnalyzer(10, 15))
+    report = analyzer.analyze_delta('main', 'feature')
+
+    assert report['merge_base'] == fork
+    assert [f['path'] for f in report['files']] == ['f.py']
+    assert report['removed_hotspots'] == []
+
+    two_dot = analyzer.analyze_delta('main', 'feature', use_merge_base=False)
+    assert [h['qualified_name'] for h in two_dot['new_hotspots']] == ['T.hot']
+
+def test_pure_deletion_does_not_report_existing_findings(repo):
+    base = _commit(repo, {'d.py': (
+        'def f(x):\n'
+        '    print(x)\n'
+        '    y = 1\n'
+        '    return x\n'
+    )}, 'base')
+    _commit(repo, {'d.py': (
+        'def f(x):\n'
+        '    print(x)\n'
+        '    return x\n'
+    )}, 'head')
+
+    report = DeltaAnalyzer(str(repo)).analyze_delta(base)
+
+    assert report['new_findings'] == []
+    assert report['files'][0]['changed_functions'] == ['f']
+
+def test_unparseable_head_file_is_an_error(repo):
+    base = _commit(repo, {'a.py': 'def f(x):\n    return x\n'}, 'base')
+    _commit(repo, {'a.py': 'def f(x):\n    return x\n\ndef (:\n'}, 'head')
+
+    report = DeltaAnalyzer(str(repo)).analyze_delta(base)
+    assert report['errors'] == [{'path': 'a.py', 'revision': 'head',
+                                 'error': 'Invalid Python syntax'}]
+
+    cli = subprocess.run([sys.executable, delta_module.__file__, base, '--repo', str(repo)],
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    assert cli.returncode == 3
+    assert 'a.py (head): Invalid Python syntax' in cli.stdout
+
+def test_coroutines_are_attributed_like_functions(repo):
+    base = _commit(repo, {'s.py': 'class S:\n    async def handle(self, x):\n        return x\n'},
+                   'base')
+    _commit(repo, {'s.py': 'class S:\n    async def handle(self, x):\n        print(x)\n'
+                   '        return x\n'}, 'head')
+
+    report = DeltaAnalyzer(str(repo)).analyze_delta(base)
+
+    assert report['files'][0]['changed_functions'] == ['S.handle']
+    assert [(f['line'], f['function']) for f in report['new_findings']] == [(3, 'S.handle')]
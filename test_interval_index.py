@@ -0,0 +1,78 @@
+import json
+import random
+
+import pytest
+
+from IntervalIndex import IntervalIndex
+
+def _nested_spans(rng, start, end, depth, spans):
+    """Generate disjoint sibling spans inside start..end, each with nested children"""
+    line = start
+    while depth and line < end and rng.random() < 0.8:
+        span_start = rng.randint(line, end)
+        span_end = rng.randint(span_start, min(end, span_start + 30))
+        spans.append({'name': f'f{len(spans)}', 'start_line': span_start,
+                      'end_line': span_end})
+        _nested_spans(rng, span_start, span_end, depth - 1, spans)
+        line = span_end + 1
+    return spans
+
+def _points(rng, last_line):
+    return [{'kind': rng.choice(['finding', 'decision_point']), 'line': rng.randint(1, last_line)}
+            for _ in range(rng.randint(0, 40))]
+
+def _round_trip(index):
+    return IntervalIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+
+def _ordered(spans):
+    return sorted(spans, key=lambda s: (s['start_line'], -s['end_line']))
+
+@pytest.mark.parametrize('seed', range(25))
+@pytest.mark.parametrize('restore', [False, True])
+def test_queries_match_linear_scan(seed, restore):
+    rng = random.Random(seed)
+    spans = _nested_spans(rng, 1, 200, 4, [])
+    points = _points(rng, 210)
+    index = IntervalIndex(spans, points)
+    if restore:
+        index = _round_trip(index)
+    spans = _ordered(spans)
+    points = sorted(points, key=lambda p: p['line'])
+
+    for line in range(0, 212):
+        containing = [s for s in spans if s['start_line'] <= line <= s['end_line']]
+        assert index.enclosing_spans(line) == containing[::-1]
+        assert index.innermost_span(line) == (containing[-1] if containing else None)
+
+    for _ in range(200):
+        start = rng.randint(0, 210)
+        end = rng.randint(start, 212)
+        overlapping = [s for s in spans if s['start_line'] <= end and s['end_line'] >= start]
+        assert index.spans_in_range(start, end) == overlapping
+        assert index.spans_in_range(start, end, lambda s: s['end_line'] - s['start_line'] > 5) == [
+            s for s in overlapping if s['end_line'] - s['start_line'] > 5]
+        inside = [p for p in points if start <= p['line'] <= end]
+        assert index.points_in_range(start, end) == inside
+        assert index.points_in_range(start, end, kind='finding') == [
+            p for p in inside if p['kind'] == 'finding']
+
+@pytest.mark.parametrize('restore', [False, True])
+def test_overhanging_span_is_clipped_to_its_parent(restore):
+    outer = {'name': 'outer', 'start_line': 1, 'end_line': 10}
+    inner = {'name': 'inner', 'start_line': 5, 'end_line': 14}
+    after = {'name': 'after', 'start_line': 12, 'end_line': 13}
+    index = IntervalIndex([inner, after, outer])
+    if restore:
+        index = _round_trip(index)
+
+    assert index.enclosing_spans(7) == [inner, outer]
+    assert index.innermost_span(11) is None
+    assert index.innermost_span(12) == after
+    assert index.spans_in_range(11, 14) == [after]
+    assert index.spans_in_range(9, 11) == [outer, inner]
+
+def test_empty_index():
+    index = _round_trip(IntervalIndex())
+    assert index.innermost_span(1) is None
+    assert index.enclosing_spans(1) == []
+    assert index.query(1, 100) == {'spans': [], 'points': []}
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from ShardedAnalysis import PartialResult, analyze_shard, merge_shards
+
+EXTRAS = [
+    "password = 'hunter2'\n",
+    "def log(x):\n    print(x)\n",
+    "query = 'SELECT * FROM t WHERE id = ' + user_id\n",
+    "try:\n    run()\nexcept:\n    pass\n",
+    "",
+]
+
+@pytest.fixture
+def manifest(tmp_path, branchy):
+    paths = []
+    for i in range(12):
+        path = tmp_path / f'm{i}.py'
+        source = branchy(f'f{i}', i * 2)
+        if i % 3 == 0:
+            source = f'class K{i}:\n' + branchy('run', i, indent=4) + '\n' + source
+        path.write_text(source + EXTRAS[i % len(EXTRAS)])
+        paths.append(str(path))
+    broken = tmp_path / 'broken.py'
+    broken.write_text('def (:\n')
+    paths.append(str(broken))
+    return paths
+
+def test_merge_rejects_different_top_k(manifest):
+    first = analyze_shard(manifest, 0, 2, top_k=5)
+    second = analyze_shard(manifest, 1, 2, top_k=1)
+
+    with pytest.raises(ValueError, match='top_k'):
+        merge_shards([first, second])
+    with pytest.raises(ValueError, match='top_k'):
+        PartialResult(top_k=5).merge(second)
+
+@pytest.mark.parametrize('num_shards', [2, 3, 5, 16])
+def test_merged_shards_match_single_run(manifest, num_shards):
+    whole = analyze_shard(manifest, 0, 1, top_k=4).finalize()
+    partials = [
+        PartialResult.from_dict(json.loads(json.dumps(
+            analyze_shard(manifest, i, num_shards, top_k=4).to_dict())))
+        for i in range(num_shards)
+    ]
+    merged = merge_shards(partials[::-1]).finalize()
+
+    assert merged == whole
+    assert whole['errors'] and whole['findings'] and whole['complexity_histogram']